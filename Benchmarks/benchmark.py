@@ -0,0 +1,643 @@
+import argparse
+import ast
+import contextlib
+import functools
+import importlib.util
+import io
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+import numpy as np
+import pandas as pd
+
+import synthetic
+from instrumentation import instrument_namespace, reset_timings, restore_namespace, stage, timing_summary
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SOURCES = {
+    'beam': 'Exercise 1/Beam Analysis/ex1.3.py',
+    'mechanical': 'Exercise 1/Mechanical Data Analysis/ex1.2.py',
+    'books': 'Exercise 1/Data Analysis and Processing/ex1.1.py',
+    'fluids': 'Exercise 2/PART 1/part1.ipynb',
+    'sensors': 'Exercise 2/PART 2/part2.ipynb',
+    'dmd': 'Midterm Project/part1_dmd_theory.ipynb',
+    'energy': 'Building Energy Analysis/bea.ipynb',
+}
+
+def _is_definition(node):
+    """True for the top-level statements of a notebook that define something: imports, functions, classes and
+    module constants or caches (assignments to UPPER_CASE or _private names only)."""
+    if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.ClassDef)):
+        return True
+    if isinstance(node, ast.Assign):
+        return all(isinstance(target, ast.Name) and (target.id.isupper() or target.id.startswith('_'))
+                   for target in node.targets)
+    return False
+
+def _register_module(name, path):
+    # Registered in sys.modules so that process pools can pickle the module's functions by reference
+    module = types.ModuleType(name)
+    module.__file__ = path
+    sys.modules[name] = module
+    return module
+
+def load_notebook(name, path):
+    """
+    Load the definitions of a notebook as a module, without running its analysis.
+
+    Only imports, function and class definitions and module constants are kept from the code cells (see
+    _is_definition); the example calls, plots and prints of the notebook, which need the real data files, are left
+    out. Later cells override earlier definitions, as they do when the notebook runs top to bottom.
+
+    Args:
+        name (str): Module name
+        path (str): Path of the .ipynb file
+    Returns:
+        module: The loaded module
+    """
+    with open(path, encoding='utf-8') as file:
+        notebook = json.load(file)
+    body = []
+    for cell in notebook['cells']:
+        if cell['cell_type'] != 'code':
+            continue
+        source = ''.join(cell['source'])
+        # IPython magics and shell commands are not Python
+        source = '\n'.join(line for line in source.split('\n') if not line.lstrip().startswith(('%', '!')))
+        body.extend(node for node in ast.parse(source).body if _is_definition(node))
+
+    module = _register_module(name, path)
+    exec(compile(ast.Module(body=body, type_ignores=[]), path, 'exec'), module.__dict__)
+    return module
+
+def load_script(name, path):
+    """
+    Import a script by path, without running its main().
+
+    Args:
+        name (str): Module name
+        path (str): Path of the .py file
+    Returns:
+        module: The loaded module
+    """
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+@functools.lru_cache(maxsize=None)
+def load_source(source):
+    """
+    Load one of the SOURCES as a module (once).
+
+    Args:
+        source (str): Key of SOURCES
+    Returns:
+        module: The loaded module
+    """
+    path = os.path.join(REPO_DIR, SOURCES[source])
+    loader = load_notebook if path.endswith('.ipynb') else load_script
+    return loader(f'bench_{source}', path)
+
+# Every case prepares the synthetic input of size n in work_dir and returns (run, reset): run() calls the entry
+# point once; reset() (or None) restores a cold state, e.g. empties a cache, before every timed call.
+
+def _beam_case(function):
+    def prepare(beam, n, work_dir):
+        loads = synthetic.beam_loads(n)
+        return (lambda: function(beam)(10.0, loads)), None
+    return prepare
+
+def _prepare_max_deflection(beam, n, work_dir):
+    loads = synthetic.beam_loads(n)
+    return (lambda: beam.calculate_max_deflection(10.0, loads, 200e9, 1e-4)), None
+
+def _prepare_analyze_beam(beam, n, work_dir):
+    loads = synthetic.beam_loads(n)
+    return (lambda: beam.analyze_beam(10.0, loads, 200e9, 1e-4)), None
+
+def _prepare_beam_batch(beam, n, work_dir):
+    filename = os.path.join(work_dir, 'beam_batch.csv')
+    synthetic.write_beam_batch(filename, n)
+
+    def run():
+        beam_ids, *arrays = beam.read_beam_batch(filename)
+        return beam.analyze_beam_batch(*arrays)
+    return run, None
+
+def _mechanical_lists(n):
+    time_data, position, force = synthetic.mechanical_log(n)
+    return list(zip(time_data.tolist(), position.tolist())), list(zip(time_data.tolist(), force.tolist()))
+
+def _prepare_work_done(mechanical, n, work_dir):
+    position_data, force_data = _mechanical_lists(n)
+    return (lambda: mechanical.calculate_work_done(force_data, position_data)), None
+
+def _prepare_kinematics(mechanical, n, work_dir):
+    position_data, _ = _mechanical_lists(n)
+    return (lambda: mechanical.calculate_acceleration(mechanical.calculate_velocity(position_data, 0.1), 0.1)), None
+
+def _prepare_mechanical_stream(mechanical, n, work_dir):
+    input_file = os.path.join(work_dir, 'mechanical_data.csv')
+    synthetic.write_mechanical_data(input_file, n)
+    output_file, samples_file = os.path.join(work_dir, 'results.csv'), os.path.join(work_dir, 'samples.csv')
+    return (lambda: mechanical.stream_mechanical_analysis(input_file, output_file, samples_file)), None
+
+def _prepare_load_books(books, n, work_dir):
+    filename = os.path.join(work_dir, 'books.csv')
+    synthetic.write_books(filename, n)
+    return (lambda: books.load_book_data(filename)), None
+
+def _prepare_catalogue_from_csv(books, n, work_dir):
+    filename = os.path.join(work_dir, 'books.csv')
+    synthetic.write_books(filename, n)
+    return (lambda: books.BookCatalogue.from_csv(filename)), None
+
+def _books_case(operation, catalogue=False):
+    def prepare(books, n, work_dir):
+        rows = synthetic.book_rows(n)
+        data = books.BookCatalogue(rows) if catalogue else rows
+        return (lambda: operation(books, data)), None
+    return prepare
+
+def _update_books(books, data):
+    # About one update per hundred books; the same updates every time, so repeated calls do the same work
+    updates = {f"Book {i}": {'price': 9.99, 'year': 2000} for i in range(0, len(data), 100)}
+    return books.update_book_properties(data, updates)
+
+def _fluid_case(function_name):
+    def prepare(fluids, n, work_dir):
+        synthetic.write_fluid_tables(work_dir, n)
+
+        def reset():
+            # Parse the CSV files every time: drop the in-memory datasets and the columnar cache
+            fluids._fluid_datasets.clear()
+            shutil.rmtree(os.path.join(work_dir, '.fluid_cache'), ignore_errors=True)
+        return (lambda: getattr(fluids, function_name)(work_dir)), reset
+    return prepare
+
+def _prepare_similar_pairs(fluids, n, work_dir):
+    # n fluids with three properties each
+    properties = np.random.default_rng(0).uniform(0.5, 2.0, size=(n, 3))
+    return (lambda: fluids.top_k_similar_pairs(properties, k=10)), None
+
+def _prepare_nearest_fluids(fluids, n, work_dir):
+    # n fluids; the dataset is parsed by the first call and reused by the timed ones, as in repeated queries
+    synthetic.write_fluid_tables(work_dir, n, n_fluids=n)
+    return (lambda: fluids.find_nearest_fluids(work_dir, fluid_id=1, k=10)), None
+
+def _prepare_cleaning_chunks(sensors, n, work_dir):
+    # A raw SYSTEMS table of n rows cleaned in ten chunks
+    file_path = os.path.join(work_dir, 'systems.csv')
+    synthetic.write_raw_systems(file_path, n)
+    chunksize = max(n // 10, 1)
+
+    def run():
+        pipeline = sensors.cleaning_pipeline('SYSTEMS')
+        return pd.concat(pipeline.run_chunks(pd.read_csv(file_path, chunksize=chunksize)))
+    # Chunked cleaning must give exactly the rows of cleaning the whole table
+    pd.testing.assert_frame_equal(run(), sensors.cleaning_pipeline('SYSTEMS').run(pd.read_csv(file_path)))
+    return run, None
+
+def _prepare_control_action_impact(sensors, n, work_dir):
+    tables = synthetic.sensor_tables(n)
+    # Time the first call on the measurements, which builds the sensor time index that later calls reuse
+    return (lambda: sensors.analyze_control_action_impact(1, *tables, plot=False)), sensors._sensor_time_indexes.clear
+
+def _prepare_statistics_store(sensors, n, work_dir):
+    _, sensors_df, measurements_df, _ = synthetic.sensor_tables(n)
+    batches = np.array_split(np.arange(len(measurements_df)), 10)
+
+    def run():
+        # Measurements arrive in ten batches, then a few sensors and the most variable ones are queried
+        store = sensors.SensorStatisticsStore(sensors_df)
+        for batch in batches:
+            store.append(measurements_df.iloc[batch])
+        for sensor_id in sensors_df['sensor_id'].iloc[:20]:
+            store.statistics(sensor_id)
+        return store.top_variable_sensors(n=10)
+    return run, None
+
+def _prepare_system_type_queries(sensors, n, work_dir):
+    tables = synthetic.sensor_tables(n)
+
+    def run():
+        index = sensors.build_system_index(*tables)
+        sensors.average_by_system_type(index)
+        sensors.average_by_sensor_and_action_type(index)
+        return sensors.describe_by_system_type(index)
+    return run, None
+
+def _prepare_signal_features(sensors, n, work_dir):
+    signal_data_df = synthetic.signal_table(n)
+    return (lambda: sensors.extract_signal_features(signal_data_df, n_workers=1)), None
+
+def _flow_data(n, n_t=100):
+    """Synthetic flow data with about n grid points, in the (n_x, n_y, n_t) layout of perform_dmd."""
+    side = max(int(math.sqrt(n)), 4)
+    return synthetic.flow_snapshots(side, side, n_t)
+
+def _prepare_perform_dmd(dmd, n, work_dir):
+    # n grid points, 100 snapshots
+    flow_data = _flow_data(n)
+    return (lambda: dmd.perform_dmd(flow_data, r=10)), None
+
+def _prepare_streaming_dmd(dmd, n, work_dir):
+    # n grid points, 100 snapshots arriving in blocks of 10
+    snapshots = _flow_data(n).reshape(-1, 100)
+
+    def run():
+        streaming = dmd.StreamingDMD(r=10)
+        for start in range(0, 100, 10):
+            streaming.update_block(snapshots[:, start:start + 10])
+        return streaming.eigenvalues
+    return run, None
+
+def _prepare_out_of_core_dmd(dmd, n, work_dir):
+    # A time-first .npy file, the layout of load_fluid_flow_data
+    file_path = os.path.join(work_dir, 'flow_data.npy')
+    np.save(file_path, np.ascontiguousarray(np.moveaxis(_flow_data(n), -1, 0)))
+    return (lambda: dmd.perform_dmd_out_of_core(file_path, r=10, time_axis=0)), None
+
+def _prepare_windowed_dmd(dmd, n, work_dir):
+    # n grid points, 400 snapshots in windows of 100 with 50% overlap
+    flow_data = _flow_data(n, n_t=400)
+    return (lambda: dmd.windowed_dmd(flow_data, window=100, step=50, r=10)), None
+
+def _cached_dmd_case(warm):
+    def prepare(dmd, n, work_dir):
+        flow_data = _flow_data(n)
+        cache = dmd.DMDCache(os.path.join(work_dir, 'dmd_cache'))
+        # Cold: the SVD and the DMD are computed and stored by every call; warm: read back after the first call
+        return (lambda: dmd.cached_perform_dmd(flow_data, r=10, cache=cache)), None if warm else cache.clear
+    return prepare
+
+def _energy_files(n, work_dir, n_buildings=100, meters=('electricity',)):
+    # n readings in total, spread over the meters
+    metadata = synthetic.building_metadata(n_buildings)
+    n_hours = max(n // (n_buildings * len(meters)), 2)
+    for seed, meter in enumerate(meters):
+        synthetic.write_meter_file(work_dir, meter, list(metadata['building_id']), n_hours, seed=seed)
+    return metadata, n_hours
+
+def _prepare_process_meter(energy, n, work_dir):
+    _energy_files(n, work_dir)
+    store_dir = os.path.join(work_dir, 'meter_store')
+    return (lambda: energy.process_meter('electricity', work_dir, store_dir)), \
+        (lambda: shutil.rmtree(store_dir, ignore_errors=True))
+
+def _prepare_process_all_meters(energy, n, work_dir):
+    meters = ['electricity', 'chilledwater', 'steam']
+    metadata, _ = _energy_files(n, work_dir, meters=meters)
+    store_dir = os.path.join(work_dir, 'meter_store')
+    return (lambda: energy.process_all_meters(meters, work_dir, store_dir, metadata=metadata)), \
+        (lambda: shutil.rmtree(store_dir, ignore_errors=True))
+
+def _prepare_join_weather(energy, n, work_dir):
+    metadata, n_hours = _energy_files(n, work_dir)
+    readings = energy.load_meters(['electricity'], data_dir=work_dir, store_dir=os.path.join(work_dir, 'meter_store'))
+    weather = synthetic.weather_table(sorted(metadata['site_id'].unique()), n_hours)
+    weather['timestamp'] = energy.parse_timestamps(weather['timestamp'])
+
+    def run():
+        index = energy.build_weather_index(weather, ['airTemperature', 'dewTemperature'])
+        return energy.join_weather(readings, metadata, index)
+    return run, None
+
+def _prepare_clean_weather(energy, n, work_dir):
+    # n weather rows over five sites
+    weather = synthetic.weather_table([f"Site{i}" for i in range(5)], max(n // 5, 2))
+    return (lambda: energy.clean_weather(weather)), None
+
+def _prepare_weather_correlation(energy, n, work_dir):
+    # n weather rows over five sites
+    weather = synthetic.weather_table([f"Site{i}" for i in range(5)], max(n // 5, 2))
+
+    def run():
+        correlation = energy.WeatherCorrelation().append(weather)
+        correlation.site_correlations()
+        return correlation.rolling_correlation(window_days=30)
+    return run, None
+
+def _prepare_impute_metadata(energy, n, work_dir):
+    metadata = synthetic.building_metadata(n)
+
+    def run():
+        filled = energy.impute_by_group(metadata, 'site_id', ['lat', 'lng'])
+        filled = energy.impute_by_group(filled, 'primaryspaceusage', ['yearbuilt'])
+        return energy.impute_by_group(filled, 'primaryspaceusage', ['heatingtype'], strategy='mode',
+                                      fallback='Unknown')
+    return run, None
+
+# name: (source, prepare, scale, stages). The input size of a case is scale times the benchmark size; stages are
+# the functions (or 'Class.method's) of the source whose time is broken down per stage.
+CASES = {
+    'beam.bending_moment': ('beam', _beam_case(lambda beam: beam.calculate_bending_moment), 1,
+                            ('_sorted_loads', '_load_sums', '_moment_at')),
+    'beam.shear_force': ('beam', _beam_case(lambda beam: beam.calculate_shear_force), 1, ('_sorted_loads',)),
+    'beam.max_deflection': ('beam', _prepare_max_deflection, 1, ()),
+    'beam.analyze_beam': ('beam', _prepare_analyze_beam, 1,
+                          ('shear_moment_diagram', 'influence_matrix', 'deflection_profile')),
+    'beam.batch': ('beam', _prepare_beam_batch, 0.2, ('read_beam_batch', 'analyze_beam_batch')),
+    'mechanical.work_done': ('mechanical', _prepare_work_done, 10, ()),
+    'mechanical.kinematics': ('mechanical', _prepare_kinematics, 10, ('calculate_velocity', 'calculate_acceleration')),
+    'mechanical.stream': ('mechanical', _prepare_mechanical_stream, 10, ('kinematics_chunk', 'write_results')),
+    'books.load_book_data': ('books', _prepare_load_books, 1, ()),
+    'books.catalogue_from_csv': ('books', _prepare_catalogue_from_csv, 1, ('BookCatalogue.__init__',)),
+    'books.filter_by_year': ('books', _books_case(lambda books, data: books.filter_books_by_year(data, 1950, 1960)),
+                             1, ()),
+    'books.filter_by_year.catalogue': ('books', _books_case(
+        lambda books, data: books.filter_books_by_year(data, 1950, 1960), catalogue=True), 1,
+        ('BookCatalogue.filter_by_year', 'BookCatalogue.books')),
+    'books.update_properties': ('books', _books_case(_update_books), 1, ()),
+    'books.update_properties.catalogue': ('books', _books_case(_update_books, catalogue=True), 1,
+                                          ('BookCatalogue.update',)),
+    'books.average_price_by_genre': ('books', _books_case(
+        lambda books, data: books.calculate_average_price_by_genre(data)), 1, ()),
+    'fluids.statistics': ('fluids', _fluid_case('calculate_fluid_statistics'), 10,
+                          ('FluidDataset._parse', 'FluidDataset._store_cache')),
+    'fluids.statistics_vectorized': ('fluids', _fluid_case('calculate_fluid_statistics_vectorized'), 10,
+                                     ('FluidDataset._parse', 'FluidDataset._store_cache', '_grouped_mean_median_std')),
+    'fluids.top_k_similar_pairs': ('fluids', _prepare_similar_pairs, 1, ('normalize_rows', '_merge_top_k')),
+    'fluids.find_nearest_fluids': ('fluids', _prepare_nearest_fluids, 1, ('k_nearest_neighbors',)),
+    'sensors.cleaning_chunks': ('sensors', _prepare_cleaning_chunks, 1, ('CleaningPipeline._run',)),
+    'sensors.statistics_store': ('sensors', _prepare_statistics_store, 10,
+                                 ('SensorStatisticsStore.append', 'SensorStatisticsStore.statistics',
+                                  'SensorStatisticsStore.top_variable_sensors')),
+    'sensors.system_type_queries': ('sensors', _prepare_system_type_queries, 10,
+                                    ('build_system_index', 'average_by_system_type',
+                                     'average_by_sensor_and_action_type', 'describe_by_system_type')),
+    'sensors.control_action_impact': ('sensors', _prepare_control_action_impact, 10,
+                                      ('control_action_impact', 'build_sensor_time_index')),
+    'sensors.signal_features': ('sensors', _prepare_signal_features, 10, ('signal_buckets', '_bucket_features')),
+    'dmd.perform_dmd': ('dmd', _prepare_perform_dmd, 1, ('compute_svd', 'dmd_kernel', 'compute_dmd_dynamics')),
+    'dmd.streaming': ('dmd', _prepare_streaming_dmd, 1, ('StreamingDMD.update_block', 'StreamingDMD._decompose')),
+    'dmd.out_of_core': ('dmd', _prepare_out_of_core_dmd, 1,
+                        ('snapshot_gram_matrix', 'gram_svd', '_project_snapshot_blocks')),
+    'dmd.windowed': ('dmd', _prepare_windowed_dmd, 1, ('_shared_copy', '_run_window_tasks')),
+    'dmd.cached_perform_dmd.cold': ('dmd', _cached_dmd_case(warm=False), 1,
+                                    ('DMDCache.fingerprint', 'cached_svd', 'dmd_kernel', 'DMDCache.store')),
+    'dmd.cached_perform_dmd.warm': ('dmd', _cached_dmd_case(warm=True), 1, ('DMDCache.fingerprint', 'DMDCache.load')),
+    'energy.process_meter': ('energy', _prepare_process_meter, 10, ('ingest_meter', 'open_meter')),
+    'energy.process_all_meters': ('energy', _prepare_process_all_meters, 10, ('process_meter',)),
+    'energy.join_weather': ('energy', _prepare_join_weather, 10,
+                            ('build_weather_index', 'join_weather', 'parse_timestamp_hours')),
+    'energy.clean_weather': ('energy', _prepare_clean_weather, 10, ('impute_by_group', '_group_interpolate')),
+    'energy.weather_correlation': ('energy', _prepare_weather_correlation, 10,
+                                   ('WeatherCorrelation.append', 'WeatherCorrelation.rolling_correlation')),
+    'energy.impute_by_group': ('energy', _prepare_impute_metadata, 1, ('_group_modes',)),
+}
+
+# The comparison benchmarks of the notebooks (old against new implementation, serial against parallel). They print
+# their own reports and are too slow to run every time a notebook runs, so they are run from here with --notebook.
+
+def _notebook_benchmark(function_name):
+    def run(module, work_dir):
+        return getattr(module, function_name)()
+    return run
+
+def _meter_pipeline_benchmark(energy, work_dir):
+    # One year of hourly readings of 100 buildings for three meters, instead of the real meter files
+    metadata, _ = _energy_files(3 * 100 * 8760, work_dir, meters=['electricity', 'chilledwater', 'steam'])
+    metadata.to_csv(os.path.join(work_dir, 'metadata.csv'), index=False)
+    return energy.benchmark_meter_pipeline(data_dir=work_dir)
+
+# name: (source, run); run(module, work_dir) runs the benchmark
+NOTEBOOK_BENCHMARKS = {
+    'fluids.similarity_search': ('fluids', _notebook_benchmark('benchmark_similarity_search')),
+    'sensors.statistics_store': ('sensors', _notebook_benchmark('benchmark_statistics_store')),
+    'sensors.spectral_engine': ('sensors', _notebook_benchmark('benchmark_spectral_engine')),
+    'dmd.svd_backends': ('dmd', _notebook_benchmark('benchmark_svd_backends')),
+    'dmd.kernel': ('dmd', _notebook_benchmark('benchmark_dmd_kernel')),
+    'dmd.out_of_core': ('dmd', _notebook_benchmark('benchmark_out_of_core')),
+    'dmd.windowed': ('dmd', _notebook_benchmark('benchmark_windowed_dmd')),
+    'energy.meter_pipeline': ('energy', _meter_pipeline_benchmark),
+}
+
+def scaling_exponent(sizes, values):
+    """
+    Slope of the least-squares line through (log size, log value): about 1 for linear, 2 for quadratic growth.
+
+    Args:
+        sizes (list): Input sizes
+        values (list): Measured times or memory
+    Returns:
+        float or None: The exponent, or None with fewer than two positive measurements
+    """
+    points = [(s, v) for s, v in zip(sizes, values) if s > 0 and v > 0]
+    if len(points) < 2 or len({s for s, _ in points}) < 2:
+        return None
+    sizes, values = zip(*points)
+    return float(np.polyfit(np.log(sizes), np.log(values), 1)[0])
+
+def _call(run):
+    with contextlib.redirect_stdout(io.StringIO()):  # the entry points report progress with print
+        run()
+
+def measure_time(run, reset=None, repeat=3):
+    """
+    Best wall time of repeated calls.
+
+    Args:
+        run (callable): The call to time
+        reset (callable or None): Called before every call, outside the timing
+        repeat (int): Number of calls
+    Returns:
+        float: The smallest time in seconds
+    """
+    best = math.inf
+    for _ in range(repeat):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        _call(run)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def measure_peak_memory(run, reset=None):
+    """
+    Peak memory allocated by one call, as traced by tracemalloc (this includes NumPy and pandas buffers but not
+    the memory of worker processes).
+
+    Args:
+        run (callable): The call to measure
+        reset (callable or None): Called before the call, outside the measurement
+    Returns:
+        int: Peak traced bytes above the memory in use before the call
+    """
+    if reset is not None:
+        reset()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        _call(run)
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+def measure_stages(case, module, stages, run, reset=None):
+    """
+    Per-stage timings of one call with the stage functions instrumented.
+
+    This is a separate call from the timed ones, so the instrumentation does not affect the wall times.
+
+    Args:
+        case (str): Case name, the outermost stage
+        module (module): The module the stage functions live in
+        stages (tuple): Names of the functions to instrument
+        run (callable): The call
+        reset (callable or None): Called before the call
+    Returns:
+        dict: timing_summary() of the call
+    """
+    if reset is not None:
+        reset()
+    reset_timings()
+    originals = instrument_namespace(module, stages)
+    try:
+        with stage(case):
+            _call(run)
+    finally:
+        restore_namespace(originals)
+    return timing_summary()
+
+def run_case(case, sizes, work_dir, repeat=3):
+    """
+    Benchmark one case at every size.
+
+    Args:
+        case (str): Key of CASES
+        sizes (list): Benchmark sizes (multiplied by the case's scale)
+        work_dir (str): Directory for the synthetic input files
+        repeat (int): Number of timed calls per size
+    Returns:
+        dict: 'n', 'seconds', 'peak_bytes' (lists, one item per size), 'time_exponent', 'memory_exponent' and
+        'stages' (per-stage timings for every n)
+    """
+    source, prepare, scale, stages = CASES[case]
+    module = load_source(source)
+    result = {'n': [], 'seconds': [], 'peak_bytes': [], 'stages': {}}
+    for size in sizes:
+        n = max(int(size * scale), 1)
+        case_dir = os.path.join(work_dir, case, str(n))
+        os.makedirs(case_dir, exist_ok=True)
+        run, reset = prepare(module, n, case_dir)
+        result['n'].append(n)
+        result['seconds'].append(measure_time(run, reset, repeat))
+        result['peak_bytes'].append(measure_peak_memory(run, reset))
+        result['stages'][n] = measure_stages(case, module, stages, run, reset)
+        print(f"{case:<36}{n:>10}{result['seconds'][-1]:>12.4f}{result['peak_bytes'][-1] / 1e6:>12.1f}")
+        shutil.rmtree(case_dir, ignore_errors=True)
+    result['time_exponent'] = scaling_exponent(result['n'], result['seconds'])
+    result['memory_exponent'] = scaling_exponent(result['n'], result['peak_bytes'])
+    return result
+
+def select_cases(patterns, cases=CASES):
+    """
+    Cases whose name equals one of the patterns or starts with it followed by a dot ('beam' selects 'beam.*').
+
+    Args:
+        patterns (list or None): Case names or prefixes; None selects every case
+        cases (dict): CASES or NOTEBOOK_BENCHMARKS
+    Returns:
+        list: Selected case names, in the order of cases
+    """
+    if not patterns:
+        return list(cases)
+    selected = [case for case in cases if any(case == p or case.startswith(p + '.') for p in patterns)]
+    if not selected:
+        raise ValueError(f"No benchmark case matches {', '.join(patterns)}; see --list")
+    return selected
+
+def run_benchmarks(cases, sizes, repeat=3, output_file=None, timings_file=None):
+    """
+    Run the selected cases and write the results.
+
+    Args:
+        cases (list): Case names
+        sizes (list): Benchmark sizes
+        repeat (int): Number of timed calls per size
+        output_file (str or None): JSON file for the wall times, peak memory and scaling exponents
+        timings_file (str or None): JSON file for the per-stage timings
+    Returns:
+        dict: Dictionary of {case: run_case result}
+    """
+    print(f"{'case':<36}{'n':>10}{'seconds':>12}{'peak MB':>12}")
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for case in cases:
+            results[case] = run_case(case, sizes, work_dir, repeat)
+
+    print(f"\n{'case':<36}{'time exponent':>16}{'memory exponent':>18}")
+    for case, result in results.items():
+        exponents = [result['time_exponent'], result['memory_exponent']]
+        print(f"{case:<36}" + ''.join(f"{'-' if e is None else f'{e:.2f}':>{w}}" for e, w in zip(exponents, (16, 18))))
+
+    if output_file:
+        summary = {case: {key: value for key, value in result.items() if key != 'stages'}
+                   for case, result in results.items()}
+        with open(output_file, mode='w') as file:
+            json.dump({'sizes': list(sizes), 'repeat': repeat, 'cases': summary}, file, indent=2)
+        print(f"Results written to {output_file}")
+    if timings_file:
+        with open(timings_file, mode='w') as file:
+            json.dump({case: result['stages'] for case, result in results.items()}, file, indent=2)
+        print(f"Stage timings written to {timings_file}")
+    return results
+
+def run_notebook_benchmarks(names):
+    """
+    Run the selected notebook benchmarks, each in a fresh temporary directory, printing their reports.
+
+    Args:
+        names (list): Keys of NOTEBOOK_BENCHMARKS
+    Returns:
+        dict: Dictionary of {name: return value of the benchmark}
+    """
+    results = {}
+    for name in names:
+        source, run = NOTEBOOK_BENCHMARKS[name]
+        module = load_source(source)
+        print(f"== {name} ({SOURCES[source]})")
+        with tempfile.TemporaryDirectory() as work_dir:
+            results[name] = run(module, work_dir)
+        print()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis entry points on synthetic data")
+    parser.add_argument("cases", nargs="*", help="case names or prefixes, e.g. 'beam' or 'dmd.perform_dmd' "
+                                                 "(default: all)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="benchmark sizes; each case scales them to its own input size")
+    parser.add_argument("--repeat", type=int, default=3, help="timed calls per size (the best one counts)")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file for the results")
+    parser.add_argument("--timings", default="stage_timings.json", help="JSON file for the per-stage timings")
+    parser.add_argument("--notebook", action="store_true",
+                        help="run the comparison benchmarks of the notebooks instead of the cases")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for case, (source, _, scale, stages) in CASES.items():
+            print(f"{case:<36}{SOURCES[source]:<48}x{scale:<6}{', '.join(stages)}")
+        print("\nNotebook benchmarks (--notebook):")
+        for name, (source, _) in NOTEBOOK_BENCHMARKS.items():
+            print(f"{name:<36}{SOURCES[source]}")
+        return
+    if args.notebook:
+        run_notebook_benchmarks(select_cases(args.cases, NOTEBOOK_BENCHMARKS))
+        return
+    run_benchmarks(select_cases(args.cases), sorted(args.sizes), args.repeat, args.output, args.timings)
+
+if __name__ == "__main__":
+    main()
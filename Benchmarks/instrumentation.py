@@ -0,0 +1,125 @@
+import functools
+import json
+import time
+from contextlib import contextmanager
+
+_timings = {}  # stage path -> list of wall times in seconds
+_stack = []    # names of the stages currently running, outermost first
+
+@contextmanager
+def stage(name):
+    """
+    Time a block of code as one stage.
+
+    Stages nest: a stage started inside another is recorded under the path 'outer/inner', so the same function
+    called from two entry points shows up twice.
+
+    Args:
+        name (str): Name of the stage
+    """
+    _stack.append(name)
+    path = '/'.join(_stack)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings.setdefault(path, []).append(time.perf_counter() - start)
+        _stack.pop()
+
+def instrument(func=None, *, name=None):
+    """
+    Decorator that times every call of a function as a stage (see stage).
+
+    Can be used bare (@instrument) or with a stage name (@instrument(name='parse')); the default name is the
+    function's name.
+
+    Args:
+        func (callable or None): The function to wrap
+        name (str or None): Stage name
+    Returns:
+        callable: The wrapped function, or a decorator if func is None
+    """
+    if func is None:
+        return functools.partial(instrument, name=name)
+    stage_name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with stage(stage_name):
+            return func(*args, **kwargs)
+    return wrapper
+
+def _resolve(namespace, dotted_name):
+    """Return (owner, attribute) for a name like 'func' or 'Class.method' in a module or dict namespace."""
+    parts = dotted_name.split('.')
+    owner = namespace
+    for part in parts[:-1]:
+        owner = owner[part] if isinstance(owner, dict) else getattr(owner, part)
+    return owner, parts[-1]
+
+def instrument_namespace(namespace, names):
+    """
+    Wrap functions of a module (or a dict of globals) with instrument, in place.
+
+    Callers look the functions up in the namespace at call time, so calls made from inside other functions of the
+    same module are timed as well. Names may refer to methods ('Class.method'). Undo with restore_namespace.
+
+    Args:
+        namespace (module or dict): Where the functions live
+        names (iterable of str): Function names to wrap
+    Returns:
+        list: (owner, attribute, original) triples for restore_namespace
+    """
+    originals = []
+    for dotted_name in names:
+        owner, attribute = _resolve(namespace, dotted_name)
+        original = owner[attribute] if isinstance(owner, dict) else owner.__dict__[attribute]
+        if isinstance(original, (staticmethod, classmethod)):
+            # Wrap the underlying function and keep the descriptor, so the method is still called the same way
+            wrapped = type(original)(instrument(original.__func__, name=dotted_name))
+        else:
+            wrapped = instrument(original, name=dotted_name)
+        if isinstance(owner, dict):
+            owner[attribute] = wrapped
+        else:
+            setattr(owner, attribute, wrapped)
+        originals.append((owner, attribute, original))
+    return originals
+
+def restore_namespace(originals):
+    """
+    Put back the functions replaced by instrument_namespace.
+
+    Args:
+        originals (list): The return value of instrument_namespace
+    """
+    for owner, attribute, original in reversed(originals):
+        if isinstance(owner, dict):
+            owner[attribute] = original
+        else:
+            setattr(owner, attribute, original)
+
+def reset_timings():
+    """Forget all recorded stage timings."""
+    _timings.clear()
+
+def timing_summary():
+    """
+    Summarize the recorded stage timings.
+
+    Returns:
+        dict: Dictionary of {stage path: {'calls', 'total', 'mean', 'max'}} with times in seconds
+    """
+    return {path: {'calls': len(times), 'total': sum(times), 'mean': sum(times) / len(times), 'max': max(times)}
+            for path, times in _timings.items()}
+
+def write_timings(filename, timings=None):
+    """
+    Write stage timings to a JSON file.
+
+    Args:
+        filename (str): Name of the JSON file
+        timings (dict or None): Timings to write; None writes timing_summary() of the recorded stages
+    """
+    with open(filename, mode='w') as file:
+        json.dump(timing_summary() if timings is None else timings, file, indent=2)
@@ -0,0 +1,349 @@
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+GENRES = ['Fantasy', 'Romance', 'Science Fiction', 'Mystery', 'Historical Fiction', 'Biography']
+SYSTEM_TYPES = ['Boiler', 'Chiller', 'Pump', 'Fan', 'Compressor']
+SENSOR_TYPES = ['temperature', 'pressure', 'flow', 'vibration']
+ACTION_TYPES = ['open', 'close', 'increase', 'decrease']
+WEATHER_VARIABLES = ['airTemperature', 'cloudCoverage', 'dewTemperature', 'precipDepth1HR', 'precipDepth6HR',
+                     'seaLvlPressure', 'windDirection', 'windSpeed']
+
+def beam_loads(n_loads, length=10.0, seed=0):
+    """
+    Random point loads on a beam.
+
+    Args:
+        n_loads (int): Number of loads
+        length (float): Length of the beam
+        seed (int): Random seed
+    Returns:
+        list of tuples: List of (position, magnitude) tuples, as returned by read_beam_data
+    """
+    rng = np.random.default_rng(seed)
+    positions = np.round(rng.uniform(0, length, n_loads), 3)
+    magnitudes = np.round(rng.uniform(100, 5000, n_loads), 1)
+    return list(zip(positions.tolist(), magnitudes.tolist()))
+
+def write_beam_batch(filename, n_beams, loads_per_beam=5, seed=0):
+    """
+    Write a batch file for read_beam_batch: one row per beam followed by the rows of its loads.
+
+    Args:
+        filename (str): Name of the CSV file
+        n_beams (int): Number of beams
+        loads_per_beam (int): Number of loads on every beam
+        seed (int): Random seed
+    """
+    rng = np.random.default_rng(seed)
+    lengths = np.round(rng.uniform(2, 20, n_beams), 2)
+    widths = np.round(rng.uniform(0.1, 0.5, n_beams), 3)
+    heights = np.round(rng.uniform(0.2, 1.0, n_beams), 3)
+    with open(filename, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['beam_id', 'length/position', 'width/magnitude', 'height', 'elastic_modulus'])
+        for i in range(n_beams):
+            writer.writerow([f"B{i}", lengths[i], widths[i], heights[i], 200e9])
+            positions = np.round(rng.uniform(0, lengths[i], loads_per_beam), 3)
+            magnitudes = np.round(rng.uniform(100, 5000, loads_per_beam), 1)
+            writer.writerows([f"B{i}", p, m] for p, m in zip(positions, magnitudes))
+
+def mechanical_log(n_samples, time_step=0.1, seed=0):
+    """
+    A noisy oscillating position and force record sampled at a fixed time step.
+
+    Args:
+        n_samples (int): Number of samples
+        time_step (float): Time between samples
+        seed (int): Random seed
+    Returns:
+        tuple: (time, position, force) arrays
+    """
+    rng = np.random.default_rng(seed)
+    time = np.arange(n_samples) * time_step
+    position = np.sin(0.5 * time) + 0.01 * rng.standard_normal(n_samples)
+    force = 100 * np.cos(0.5 * time) + rng.standard_normal(n_samples)
+    return time, position, force
+
+def write_mechanical_data(filename, n_samples, time_step=0.1, seed=0):
+    """
+    Write a mechanical log as a CSV file for read_mechanical_data and read_mechanical_chunks.
+
+    Args:
+        filename (str): Name of the CSV file
+        n_samples (int): Number of samples
+        time_step (float): Time between samples
+        seed (int): Random seed
+    """
+    time, position, force = mechanical_log(n_samples, time_step, seed)
+    np.savetxt(filename, np.column_stack([time, position, force]), delimiter=',', fmt='%.6f',
+               header='time,position,force', comments='')
+
+def book_rows(n_books, seed=0):
+    """
+    Random books, about twenty per author.
+
+    Args:
+        n_books (int): Number of books
+        seed (int): Random seed
+    Returns:
+        list of dict: List of dictionaries like the ones load_book_data returns
+    """
+    rng = np.random.default_rng(seed)
+    authors = rng.integers(0, n_books // 20 + 1, n_books)
+    years = rng.integers(1900, 2024, n_books)
+    genres = rng.integers(0, len(GENRES), n_books)
+    prices = np.round(rng.uniform(5, 30, n_books), 2)
+    return [{'title': f"Book {i}", 'author': f"Author {a}", 'year': int(y), 'genre': GENRES[g], 'price': float(p)}
+            for i, (a, y, g, p) in enumerate(zip(authors, years, genres, prices))]
+
+def write_books(filename, n_books, seed=0):
+    """
+    Write random books as a CSV file for load_book_data.
+
+    Args:
+        filename (str): Name of the CSV file
+        n_books (int): Number of books
+        seed (int): Random seed
+    """
+    with open(filename, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=['title', 'author', 'year', 'genre', 'price'])
+        writer.writeheader()
+        writer.writerows(book_rows(n_books, seed))
+
+def write_fluid_tables(root_dir, n_measurements, n_fluids=50, measurements_per_experiment=100, seed=0):
+    """
+    Write fluids.csv, experiments.csv and fluid_measurements.csv to root_dir.
+
+    Args:
+        root_dir (str): Output directory
+        n_measurements (int): Number of measurements
+        n_fluids (int): Number of fluids
+        measurements_per_experiment (int): Average number of measurements per experiment
+        seed (int): Random seed
+    """
+    rng = np.random.default_rng(seed)
+    n_experiments = max(n_measurements // measurements_per_experiment, n_fluids)
+    fluids = pd.DataFrame({
+        'fluid_id': np.arange(1, n_fluids + 1),
+        'fluid_name': [f"Fluid {i}" for i in range(1, n_fluids + 1)],
+        'density': np.round(rng.uniform(600, 1500, n_fluids), 1),
+        'viscosity': rng.uniform(1e-4, 1.0, n_fluids),
+        'specific_heat': np.round(rng.uniform(1000, 4200, n_fluids), 0),
+    })
+    experiments = pd.DataFrame({
+        'experiment_id': np.arange(1, n_experiments + 1),
+        'fluid_id': np.r_[fluids['fluid_id'], rng.integers(1, n_fluids + 1, n_experiments - n_fluids)],
+        'date': (np.datetime64('2024-01-01') + rng.integers(0, 365, n_experiments)).astype(str),
+    })
+    measurements = pd.DataFrame({'measurement_id': np.arange(1, n_measurements + 1),
+                                 'experiment_id': rng.integers(1, n_experiments + 1, n_measurements)})
+    for col, scale in [('pressure', 100), ('velocity', 10), ('temperature', 300), ('flow_rate', 50)]:
+        measurements[col] = scale * rng.lognormal(0, 0.2, n_measurements)
+
+    os.makedirs(root_dir, exist_ok=True)
+    fluids.to_csv(os.path.join(root_dir, 'fluids.csv'), index=False)
+    experiments.to_csv(os.path.join(root_dir, 'experiments.csv'), index=False)
+    measurements.to_csv(os.path.join(root_dir, 'fluid_measurements.csv'), index=False)
+
+def sensor_tables(n_measurements, n_systems=10, sensors_per_system=10, actions_per_system=20, seed=0):
+    """
+    Cleaned systems, sensors, measurements and control actions tables, as produced by clean_data.
+
+    Measurements of each sensor are one minute apart; control actions fall at random times within the record.
+
+    Args:
+        n_measurements (int): Number of measurements
+        n_systems (int): Number of systems
+        sensors_per_system (int): Number of sensors of each system
+        actions_per_system (int): Number of control actions of each system
+        seed (int): Random seed
+    Returns:
+        tuple: (systems_df, sensors_df, measurements_df, control_actions_df)
+    """
+    rng = np.random.default_rng(seed)
+    n_sensors = n_systems * sensors_per_system
+    start = np.datetime64('2024-01-01T00:00', 'ns')
+    systems_df = pd.DataFrame({'system_id': np.arange(1, n_systems + 1),
+                               'system_name': [f"System {i}" for i in range(1, n_systems + 1)],
+                               'system_type': [SYSTEM_TYPES[i % len(SYSTEM_TYPES)] for i in range(n_systems)]})
+    sensors_df = pd.DataFrame({'sensor_id': np.arange(1, n_sensors + 1),
+                               'system_id': np.repeat(systems_df['system_id'].to_numpy(), sensors_per_system),
+                               'sensor_name': [f"Sensor {i}" for i in range(1, n_sensors + 1)],
+                               'sensor_type': [SENSOR_TYPES[i % len(SENSOR_TYPES)] for i in range(n_sensors)],
+                               'unit': 'u'})
+
+    sensor_ids = rng.integers(1, n_sensors + 1, n_measurements)
+    order = np.argsort(sensor_ids, kind='stable')
+    minute = np.empty(n_measurements, dtype=np.int64)
+    counts = np.bincount(sensor_ids, minlength=n_sensors + 1)
+    minute[order] = np.arange(n_measurements) - np.repeat(np.cumsum(counts) - counts, counts)
+    measurements_df = pd.DataFrame({'measurement_id': np.arange(1, n_measurements + 1),
+                                    'sensor_id': sensor_ids,
+                                    'timestamp': start + minute * np.timedelta64(1, 'm'),
+                                    'value': 50 + 10 * rng.standard_normal(n_measurements)})
+
+    n_minutes = max(int(counts.max()), 1)
+    n_actions = n_systems * actions_per_system
+    control_actions_df = pd.DataFrame({
+        'action_id': np.arange(1, n_actions + 1),
+        'system_id': np.repeat(systems_df['system_id'].to_numpy(), actions_per_system),
+        'timestamp': start + rng.integers(0, n_minutes, n_actions) * np.timedelta64(1, 'm'),
+        'action_type': [ACTION_TYPES[i] for i in rng.integers(0, len(ACTION_TYPES), n_actions)],
+    })
+    return systems_df, sensors_df, measurements_df, control_actions_df
+
+def write_raw_systems(filename, n_systems, missing=0.05, seed=0):
+    """
+    Write a systems.csv as it arrives before cleaning: missing ids, missing names and text timestamps.
+
+    Args:
+        filename (str): Output CSV path
+        n_systems (int): Number of rows
+        missing (float): Fraction of missing system_id and system_name values
+        seed (int): Random seed
+    """
+    rng = np.random.default_rng(seed)
+    system_id = np.arange(1, n_systems + 1, dtype=float)
+    system_id[rng.random(n_systems) < missing] = np.nan
+    names = pd.Series([f"System {i}" for i in range(1, n_systems + 1)]).mask(rng.random(n_systems) < missing)
+    timestamps = np.datetime64('2024-01-01T00:00', 's') + np.arange(n_systems) * np.timedelta64(1, 'h')
+    pd.DataFrame({
+        'system_id': system_id,
+        'system_name': names,
+        'system_type': [SYSTEM_TYPES[i % len(SYSTEM_TYPES)] for i in range(n_systems)],
+        'timestamp': pd.to_datetime(timestamps).strftime('%Y-%m-%d %H:%M:%S'),
+    }).to_csv(filename, index=False)
+
+def signal_table(n_samples, n_sensors=100, sampling_rate=100.0, seed=0):
+    """
+    Noisy sine waves of random frequency and amplitude, one per sensor, in the signal_data schema.
+
+    Args:
+        n_samples (int): Total number of samples over all sensors
+        n_sensors (int): Number of sensors
+        sampling_rate (float): Samples per second
+        seed (int): Random seed
+    Returns:
+        pd.DataFrame: Columns signal_id, sensor_id, timestamp and value
+    """
+    rng = np.random.default_rng(seed)
+    per_sensor = max(n_samples // n_sensors, 2)
+    sensor_ids = np.repeat(np.arange(1, n_sensors + 1), per_sensor)
+    t = np.tile(np.arange(per_sensor) / sampling_rate, n_sensors)
+    frequency = rng.uniform(0.5, sampling_rate / 4, n_sensors)[sensor_ids - 1]
+    amplitude = rng.uniform(1, 10, n_sensors)[sensor_ids - 1]
+    return pd.DataFrame({
+        'signal_id': np.arange(1, sensor_ids.size + 1),
+        'sensor_id': sensor_ids,
+        'timestamp': np.datetime64('2024-01-01T00:00', 'ns') + (t * 1e9).astype(np.int64).astype('timedelta64[ns]'),
+        'value': amplitude * np.sin(2 * np.pi * frequency * t) + 0.1 * rng.standard_normal(sensor_ids.size),
+    })
+
+def building_metadata(n_buildings, n_sites=5, seed=0):
+    """
+    Building metadata with the columns the energy analysis uses.
+
+    Args:
+        n_buildings (int): Number of buildings
+        n_sites (int): Number of sites
+        seed (int): Random seed
+    Returns:
+        pd.DataFrame: Columns building_id, site_id, primaryspaceusage, sqm, lat, lng, yearbuilt and heatingtype,
+        with some values missing
+    """
+    rng = np.random.default_rng(seed)
+    sites = [f"Site{i}" for i in range(n_sites)]
+    site = rng.integers(0, n_sites, n_buildings)
+    usage = np.array(['Education', 'Office', 'Lodging', 'Retail'])[rng.integers(0, 4, n_buildings)]
+    metadata = pd.DataFrame({
+        'building_id': [f"{sites[s]}_{u.lower()}_{i}" for i, (s, u) in enumerate(zip(site, usage))],
+        'site_id': [sites[s] for s in site],
+        'primaryspaceusage': usage,
+        'sqm': np.round(rng.uniform(500, 50000, n_buildings), 1),
+        'lat': (10.0 * site + 20).astype(float),
+        'lng': (-5.0 * site - 80).astype(float),
+        'yearbuilt': rng.integers(1900, 2017, n_buildings).astype(float),
+        'heatingtype': np.array(['Gas', 'Electric', 'Steam'])[rng.integers(0, 3, n_buildings)],
+    })
+    for col in ['lat', 'lng', 'yearbuilt', 'heatingtype']:
+        metadata.loc[rng.random(n_buildings) < 0.2, col] = np.nan
+    return metadata
+
+def weather_table(sites, n_hours, seed=0):
+    """
+    Hourly raw weather for every site, with the precipitation sentinels and gaps of the real file.
+
+    Args:
+        sites (list): Site ids
+        n_hours (int): Number of hours from 2016-01-01 00:00
+        seed (int): Random seed
+    Returns:
+        pd.DataFrame: Columns timestamp (text, '%Y-%m-%d %H:%M:%S'), site_id and the weather variables
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = len(sites) * n_hours
+    hours = np.tile(np.arange(n_hours), len(sites))
+    timestamps = (np.datetime64('2016-01-01T00', 'h') + np.arange(n_hours)).astype('datetime64[s]')
+    weather = pd.DataFrame({
+        'timestamp': np.tile(pd.to_datetime(timestamps).strftime('%Y-%m-%d %H:%M:%S').to_numpy(), len(sites)),
+        'site_id': np.repeat(sites, n_hours),
+        'airTemperature': 15 + 10 * np.sin(2 * np.pi * hours / 24) + rng.standard_normal(n_rows),
+        'cloudCoverage': rng.integers(0, 9, n_rows).astype(float),
+        'dewTemperature': 5 + 5 * np.sin(2 * np.pi * hours / 24) + rng.standard_normal(n_rows),
+        'precipDepth1HR': rng.choice([-1.0, 0.0, 0.0, 0.0, 3.0], n_rows),
+        'precipDepth6HR': rng.choice([-1.0, 0.0, 0.0, 0.0, 10.0], n_rows),
+        'seaLvlPressure': 1015 + 5 * rng.standard_normal(n_rows),
+        'windDirection': rng.choice([0.0, 90.0, 180.0, 270.0], n_rows),
+        'windSpeed': rng.choice([0.0, 1.5, 2.5, 5.0], n_rows),
+    })
+    for col in ['cloudCoverage', 'seaLvlPressure']:
+        weather.loc[rng.random(n_rows) < 0.3, col] = np.nan
+    return weather
+
+def write_meter_file(data_dir, meter, buildings, n_hours, missing=0.05, seed=0):
+    """
+    Write a wide <meter>_cleaned.csv: one timestamp column and one column of hourly readings per building.
+
+    Args:
+        data_dir (str): Output directory
+        meter (str): Meter name, e.g. 'electricity'
+        buildings (list): Building ids (the column names)
+        n_hours (int): Number of hours from 2016-01-01 00:00
+        missing (float): Fraction of missing readings
+        seed (int): Random seed
+    """
+    rng = np.random.default_rng(seed)
+    timestamps = (np.datetime64('2016-01-01T00', 'h') + np.arange(n_hours)).astype('datetime64[s]')
+    readings = np.round(rng.gamma(2.0, 50.0, (n_hours, len(buildings))), 3)
+    readings[rng.random(readings.shape) < missing] = np.nan
+    wide = pd.DataFrame(readings, columns=buildings)
+    wide.insert(0, 'timestamp', pd.to_datetime(timestamps).strftime('%Y-%m-%d %H:%M:%S'))
+    os.makedirs(data_dir, exist_ok=True)
+    wide.to_csv(os.path.join(data_dir, f'{meter}_cleaned.csv'), index=False)
+
+def flow_snapshots(n_x, n_y, n_t, n_modes=5, noise=1e-3, seed=0):
+    """
+    A flow field made of a few travelling waves plus noise, in the (n_x, n_y, n_t) layout of perform_dmd.
+
+    Args:
+        n_x (int): Grid points in x
+        n_y (int): Grid points in y
+        n_t (int): Number of snapshots
+        n_modes (int): Number of travelling waves
+        noise (float): Standard deviation of the added noise
+        seed (int): Random seed
+    Returns:
+        np.ndarray: Array of shape (n_x, n_y, n_t)
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 2 * np.pi, n_x)[:, None, None]
+    y = np.linspace(0, np.pi, n_y)[None, :, None]
+    t = (np.arange(n_t) / 100)[None, None, :]
+    flow = np.zeros((n_x, n_y, n_t))
+    for k in range(1, n_modes + 1):
+        frequency, decay = rng.uniform(0.5, 5), rng.uniform(0, 0.2)
+        flow += np.exp(-decay * t) * np.sin(k * x - 2 * np.pi * frequency * t) * np.cos(k * y) / k
+    return flow + noise * rng.standard_normal(flow.shape)
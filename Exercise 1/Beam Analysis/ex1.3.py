@@ -1,5 +1,10 @@
+import argparse
 import csv
 import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
 
 def read_beam_data(filename):
     """
@@ -47,19 +52,11 @@ def calculate_bending_moment(length, loads):
     float: Maximum bending moment
     """
     # TODO: Implement bending moment calculation
-    # Initializing the max moment
-    max_moment = 0.0
-    positions = [0] + [load[0] for load in loads] + [length]
-
-    for x in positions:
-        moment = 0
-
-        for position, magnitude in loads:
-            if position <= x:
-                distance = x - position
-                moment += magnitude * distance
-        max_moment = max(max_moment, moment)
-    return max_moment
+    # The moment is piecewise linear between loads, so its maximum is at a load point or an end
+    positions, magnitudes = _sorted_loads(loads)
+    x = np.concatenate(([0.0], positions, [length]))
+    moment = _moment_at(x, positions, *_load_sums(positions, magnitudes))
+    return max(0.0, float(moment.max()))
 
 def calculate_shear_force(length, loads):
     """
@@ -73,20 +70,13 @@ def calculate_shear_force(length, loads):
     float: Maximum shear force
     """
     # TODO: Implement shear force calculation
-    max_shear = 0.0
-    shear_force = 0.0
-
-    positions = [0] + [load[0] for load in loads] + [length]
-    loads_sorted = sorted(loads)
-
-    for x in positions:
-        for position, magnitude in loads_sorted:
-            if position < x:
-                shear_force -= magnitude
-            else:
-                break
-        max_shear = max(max_shear, abs(shear_force))
-    return max_shear
+    # Loads strictly before each position (positions in the given load order); as before, the shear force is
+    # carried over from one position to the next
+    positions, magnitudes = _sorted_loads(loads)
+    x = np.array([0.0] + [load[0] for load in loads] + [length])
+    cum_magnitude = np.concatenate(([0.0], np.cumsum(magnitudes)))
+    shear_force = -np.cumsum(cum_magnitude[np.searchsorted(positions, x, side='left')])
+    return max(0.0, float(np.abs(shear_force).max()))
 
 def calculate_max_bending_stress(max_moment, moment_of_inertia, y_max):
     """
@@ -153,6 +143,140 @@ def calculate_max_deflection(length, loads, elastic_modulus, moment_of_inertia):
         max_deflection += deflection
     return max_deflection
 
+def _sorted_loads(loads):
+    """Load positions and magnitudes as arrays sorted by position."""
+    loads = np.asarray(loads, dtype=float).reshape(-1, 2)
+    order = np.argsort(loads[:, 0], kind='stable')
+    return loads[order, 0], loads[order, 1]
+
+def _load_sums(positions, magnitudes):
+    """Cumulative sums of P and P * a over the sorted loads, with a leading 0 for 'no load yet'."""
+    return (np.concatenate(([0.0], np.cumsum(magnitudes))),
+            np.concatenate(([0.0], np.cumsum(magnitudes * positions))))
+
+def _moment_at(x, positions, cum_magnitude, cum_first_moment):
+    """Moment sum(P * (x - a)) of the loads at a <= x, as x * sum(P) - sum(P * a)."""
+    k = np.searchsorted(positions, x, side='right')
+    return x * cum_magnitude[k] - cum_first_moment[k]
+
+def shear_moment_diagram(length, loads, n_points=201):
+    """
+    Calculate the shear force and bending moment diagrams on an evenly spaced grid.
+
+    Uses the same convention as calculate_bending_moment and calculate_shear_force: at x, the loads to the left of
+    x give the shear force -sum(P) and the moment sum(P * (x - a)). The loads are sorted once and both diagrams
+    come from cumulative sums, so the cost is O(n log n + m) for n loads and m grid points.
+
+    Args:
+    length (float): Length of the beam
+    loads (list): List of (position, magnitude) tuples for each load
+    n_points (int): Number of grid points from 0 to length
+
+    Returns:
+    tuple: (x, shear, moment) arrays
+    """
+    positions, magnitudes = _sorted_loads(loads)
+    cum_magnitude, cum_first_moment = _load_sums(positions, magnitudes)
+    x = np.linspace(0.0, length, n_points)
+    shear = -cum_magnitude[np.searchsorted(positions, x, side='left')]
+    moment = _moment_at(x, positions, cum_magnitude, cum_first_moment)
+    return x, shear, moment
+
+@lru_cache(maxsize=32)
+def influence_matrix(length, elastic_modulus, moment_of_inertia, n_points=201):
+    """
+    Calculate the deflection influence matrix of a simply supported beam on an evenly spaced grid.
+
+    Entry (i, j) is the deflection at grid point i due to a unit load at grid point j. The matrix is cached per
+    (length, elastic modulus, moment of inertia, grid) and returned read-only.
+
+    Args:
+    length (float): Length of the beam
+    elastic_modulus (float): Elastic modulus of the beam material
+    moment_of_inertia (float): Moment of inertia of the beam cross-section
+    n_points (int): Number of grid points from 0 to length
+
+    Returns:
+    np.ndarray: (n_points, n_points) influence matrix
+    """
+    if elastic_modulus == 0 or moment_of_inertia == 0 or length == 0:
+        raise ValueError("Length, elastic modulus and moment of inertia must not be 0")
+    x = np.linspace(0.0, length, n_points)[:, None]
+    a = x.T
+    # Deflection at x due to a unit load at a: x * b * (L^2 - b^2 - x^2) / (6 E I L) for x <= a, with b = L - a,
+    # and the mirror image for x > a
+    left = x * (length - a) * (length**2 - (length - a)**2 - x**2)
+    right = a * (length - x) * (2 * length * x - x**2 - a**2)
+    matrix = np.where(x <= a, left, right) / (6 * elastic_modulus * moment_of_inertia * length)
+    matrix.setflags(write=False)
+    return matrix
+
+def deflection_profile(length, loads, elastic_modulus, moment_of_inertia, n_points=201):
+    """
+    Calculate the deflection of a simply supported beam on an evenly spaced grid.
+
+    Each load is split between its two neighbouring grid points in proportion to its distance to them (exact for
+    loads on grid points), and the deflection is the cached influence matrix times that grid load vector.
+
+    Args:
+    length (float): Length of the beam
+    loads (list): List of (position, magnitude) tuples for each load
+    elastic_modulus (float): Elastic modulus of the beam material
+    moment_of_inertia (float): Moment of inertia of the beam cross-section
+    n_points (int): Number of grid points from 0 to length, at least 2
+
+    Returns:
+    tuple: (x, deflection) arrays
+    """
+    if n_points < 2:
+        raise ValueError("The deflection grid needs at least 2 points")
+    positions, magnitudes = _sorted_loads(loads)
+    if positions.size and (positions[0] < 0 or positions[-1] > length):
+        raise ValueError("Load position must be within the beam length")
+    matrix = influence_matrix(float(length), float(elastic_modulus), float(moment_of_inertia), n_points)
+    spacing = length / (n_points - 1)
+    left = np.minimum((positions / spacing).astype(int), n_points - 2)
+    weight = positions / spacing - left
+    grid_loads = (np.bincount(left, magnitudes * (1 - weight), minlength=n_points)
+                  + np.bincount(left + 1, magnitudes * weight, minlength=n_points))
+    return np.linspace(0.0, length, n_points), matrix @ grid_loads
+
+def analyze_beam(length, loads, elastic_modulus, moment_of_inertia, n_points=201):
+    """
+    Calculate the shear force, bending moment and deflection diagrams of a beam and their maxima.
+
+    The maximum moment and shear force are exact (they are taken at the load points, where the piecewise linear
+    and piecewise constant diagrams have their extremes); the maximum deflection is taken on the grid.
+
+    Args:
+    length (float): Length of the beam
+    loads (list): List of (position, magnitude) tuples for each load
+    elastic_modulus (float): Elastic modulus of the beam material
+    moment_of_inertia (float): Moment of inertia of the beam cross-section
+    n_points (int): Number of grid points from 0 to length, at least 2
+
+    Returns:
+    dict: x, shear, moment and deflection arrays, and max_moment, max_shear and max_deflection
+    """
+    positions, magnitudes = _sorted_loads(loads)
+    cum_magnitude, cum_first_moment = _load_sums(positions, magnitudes)
+    x, shear, moment = shear_moment_diagram(length, loads, n_points)
+    _, deflection = deflection_profile(length, loads, elastic_modulus, moment_of_inertia, n_points)
+
+    load_moments = _moment_at(np.concatenate((positions, [length])), positions, cum_magnitude, cum_first_moment)
+    # Just right of a load point the shear force includes all loads there; loads at the right end have no right side
+    right_of_load = np.append(positions[1:] != positions[:-1], True) & (positions < length)
+    load_shears = cum_magnitude[1:][right_of_load]
+    return {
+        "x": x,
+        "shear": shear,
+        "moment": moment,
+        "deflection": deflection,
+        "max_moment": max(0.0, float(load_moments.max())),
+        "max_shear": float(np.abs(load_shears).max(initial=0.0)),
+        "max_deflection": float(np.abs(deflection).max()),
+    }
+
 def write_results(filename, results_data):
     """
     Write calculation results to a CSV file.
@@ -168,9 +292,202 @@ def write_results(filename, results_data):
         writer.writerow(results_data.values())
     print(f"Results succesfully written to {filename}")
 
+def read_beam_batch(filename):
+    """
+    Read many beams from one CSV file in a single pass.
+
+    After a header row, every row with five fields is a beam (beam_id, length, width, height, elastic_modulus) and
+    every row with three fields is a load on a beam (beam_id, position, magnitude). Loads may come before or after
+    their beam's row; other rows are skipped.
+
+    Args:
+    filename (str): Name of the CSV file
+
+    Returns:
+    tuple: (beam_ids, properties, load_beams, load_positions, load_magnitudes)
+    where properties is an (n_beams, 4) array of length, width, height and elastic modulus and load_beams gives
+    the index of each load's beam in beam_ids
+    """
+    codes = {}
+    properties = {}
+    load_beams, load_positions, load_magnitudes = [], [], []
+    with open(filename, mode='r', newline='', buffering=1 << 20) as file:
+        csv_reader = csv.reader(file)
+        next(csv_reader, None)
+        for row in csv_reader:
+            if len(row) == 5:
+                code = codes.setdefault(row[0], len(codes))
+                properties[code] = [float(value) for value in row[1:]]
+            elif len(row) == 3:
+                load_beams.append(codes.setdefault(row[0], len(codes)))
+                load_positions.append(float(row[1]))
+                load_magnitudes.append(float(row[2]))
+
+    beam_ids = list(codes)
+    missing = [beam_id for beam_id, code in codes.items() if code not in properties]
+    if missing:
+        raise ValueError(f"Loads without beam properties for beam(s): {', '.join(missing[:10])}")
+    return (beam_ids,
+            np.array([properties[code] for code in range(len(beam_ids))], dtype=float).reshape(-1, 4),
+            np.array(load_beams, dtype=np.int64),
+            np.array(load_positions, dtype=float),
+            np.array(load_magnitudes, dtype=float))
+
+def _segment_cumsum(values, segment_start):
+    """Cumulative sums of values restarting at every segment, given the index of each element's segment start."""
+    # Log-step scan: every sum only adds values of its own segment, so segments do not affect each other
+    result = np.array(values, dtype=float)
+    rank = np.arange(len(result)) - segment_start
+    step = 1
+    while step <= rank.max(initial=0):
+        later = np.flatnonzero(rank >= step)
+        result[later] += result[later - step]
+        step *= 2
+    return result
+
+def analyze_beam_batch(properties, load_beams, load_positions, load_magnitudes):
+    """
+    Calculate the maximum bending stress, shear stress and deflection of many beams at once.
+
+    Gives the same results as main() does for each beam on its own (up to rounding), with array operations over
+    all beams and loads: the loads are sorted by (beam, position) once and every per-beam running sum restarts at
+    the beam's first load, so a beam's results do not depend on the other beams in the batch.
+
+    Args:
+    properties (np.ndarray): (n_beams, 4) array of length, width, height and elastic modulus
+    load_beams (np.ndarray): Beam index of each load
+    load_positions (np.ndarray): Position of each load
+    load_magnitudes (np.ndarray): Magnitude of each load
+
+    Returns:
+    dict: max_bending_stress, max_shear_stress and max_deflection arrays, one value per beam
+    """
+    length, width, height, elastic_modulus = np.asarray(properties, dtype=float).reshape(-1, 4).T
+    n_beams = len(length)
+    beam, position, magnitude = load_beams, load_positions, load_magnitudes
+
+    # Section properties
+    moment_of_inertia = (width * height**3) / 12
+    y_max = height / 2
+    first_moment = (width * height**2) / 8
+    if np.any(moment_of_inertia == 0) or np.any(width == 0):
+        raise ValueError("Moment of Inertia and width must not be 0")
+    if np.any((position < 0) | (position > length[beam])):
+        raise ValueError("Load position must be within the beam length")
+
+    # Loads sorted by (beam, position), keeping the file order for equal keys
+    order = np.lexsort((position, beam))
+    b, p, P = beam[order], position[order], magnitude[order]
+    base = np.searchsorted(b, b, side='left')  # first load of each load's beam
+    cum_magnitude = _segment_cumsum(P, base)
+    cum_first_moment = _segment_cumsum(P * p, base)
+    total_magnitude = np.bincount(b, P, minlength=n_beams)
+    total_first_moment = np.bincount(b, P * p, minlength=n_beams)
+
+    # Range of loads at the same (beam, position) as each load
+    new_point = np.ones(len(b), dtype=bool)
+    new_point[1:] = (b[1:] != b[:-1]) | (p[1:] != p[:-1])
+    point = np.cumsum(new_point) - 1
+    point_start = np.flatnonzero(new_point)[point]
+    point_end = np.r_[np.flatnonzero(new_point)[1:], len(b)][point]
+
+    # Bending moment at every load point (loads at or before it) and at the right end (all loads)
+    load_moment = p * cum_magnitude[point_end - 1] - cum_first_moment[point_end - 1]
+    max_moment = length * total_magnitude - total_first_moment
+    np.maximum.at(max_moment, b, load_moment)
+    max_moment = np.maximum(max_moment, 0.0)
+
+    # Shear force as in calculate_shear_force: at every position (0, the loads in file order, then the length) the
+    # loads strictly before it are subtracted from a running total
+    before = np.empty(len(b))
+    before[order] = np.where(point_start > base, cum_magnitude[point_start - 1], 0.0)
+    before_end = total_magnitude - np.bincount(b, P * (p == length[b]), minlength=n_beams)
+    file_order = np.argsort(beam, kind='stable')
+    beam_in_file_order = beam[file_order]
+    running = _segment_cumsum(before[file_order], np.searchsorted(beam_in_file_order, beam_in_file_order))
+    max_shear = np.abs(np.bincount(beam_in_file_order, before[file_order], minlength=n_beams) + before_end)
+    np.maximum.at(max_shear, beam_in_file_order, np.abs(running))
+
+    # Deflection as in calculate_max_deflection
+    deflection_sum = np.bincount(beam, magnitude * position * (length[beam] - position)**2, minlength=n_beams)
+    max_deflection = deflection_sum / (6 * elastic_modulus * moment_of_inertia * length)
+
+    return {
+        "max_bending_stress": (max_moment * y_max) / moment_of_inertia,
+        "max_shear_stress": (max_shear * first_moment) / (moment_of_inertia * width),
+        "max_deflection": max_deflection,
+    }
+
+def _analyze_beam_block(block):
+    """Worker for run_beam_batch: analyze one block of beams."""
+    return analyze_beam_batch(*block)
+
+def run_beam_batch(input_file, output_file, n_workers=1, block_size=10000):
+    """
+    Analyze all beams of a multi-beam input file and write one result row per beam.
+
+    The beams are processed in blocks of block_size; with n_workers > 1 the blocks are spread over a process pool.
+
+    Args:
+    input_file (str): Name of the multi-beam CSV file (see read_beam_batch)
+    output_file (str): Name of the output CSV file
+    n_workers (int): Number of worker processes
+    block_size (int): Number of beams per block
+    """
+    beam_ids, properties, load_beams, load_positions, load_magnitudes = read_beam_batch(input_file)
+
+    # Loads grouped by beam (file order kept within a beam), so every block of beams has a contiguous slice of loads
+    order = np.argsort(load_beams, kind='stable')
+    load_beams, load_positions, load_magnitudes = load_beams[order], load_positions[order], load_magnitudes[order]
+    bounds = np.searchsorted(load_beams, np.arange(0, len(beam_ids) + block_size, block_size))
+    blocks = []
+    for start, (load_start, load_stop) in zip(range(0, len(beam_ids), block_size), zip(bounds[:-1], bounds[1:])):
+        blocks.append((properties[start:start + block_size],
+                       load_beams[load_start:load_stop] - start,
+                       load_positions[load_start:load_stop],
+                       load_magnitudes[load_start:load_stop]))
+
+    if n_workers > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            block_results = list(executor.map(_analyze_beam_block, blocks))
+    else:
+        block_results = [_analyze_beam_block(block) for block in blocks]
+
+    keys = ["max_bending_stress", "max_shear_stress", "max_deflection"]
+    results = {key: np.concatenate([r[key] for r in block_results]) if block_results else np.zeros(0) for key in keys}
+    write_batch_results(output_file, beam_ids, results)
+
+def write_batch_results(filename, beam_ids, results):
+    """
+    Write the results of many beams to a CSV file through one buffered writer.
+
+    Args:
+    filename (str): Name of the output CSV file
+    beam_ids (list): Beam ids, one per row
+    results (dict): Dictionary of result arrays, one value per beam
+    """
+    with open(filename, mode='w', newline='', buffering=1 << 20) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["beam_id"] + list(results.keys()))
+        writer.writerows(zip(beam_ids, *(values.tolist() for values in results.values())))
+    print(f"Results for {len(beam_ids)} beams written to {filename}")
+
 def main():
+    parser = argparse.ArgumentParser(description="Beam analysis")
+    parser.add_argument("--batch", metavar="INPUT", help="analyze every beam of a multi-beam CSV file")
+    parser.add_argument("--output", help="output CSV file")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes in batch mode")
+    args = parser.parse_args()
+
+    if args.batch:
+        try:
+            run_beam_batch(args.batch, args.output or "beam_batch_results.csv", n_workers=args.workers)
+        except Exception as e:
+            print(f"An error occurred: {str(e)}")
+        return
+
     input_file = "beam_data.csv"
-    output_file = "beam_analysis_results.csv"
+    output_file = args.output or "beam_analysis_results.csv"
 
     try:
         # Read beam data
@@ -1,5 +1,294 @@
+import argparse
+import bisect
 import csv
 import json
+import random
+import time
+from array import array
+from operator import itemgetter
+
+class BookCatalogue:
+    """
+    Column-oriented book collection with indexes for the common queries.
+
+    Every property is stored as a column (arrays for year and prices, lists for the strings), so a catalogue of
+    a million books does not hold a million dictionaries. A title -> row index makes updates by title O(1), a sorted
+    year index answers year range queries with bisect in O(log n + k), and the per-genre price totals and per-author
+    book counts are kept up to date on every update and currency conversion, so the statistics need no pass over the
+    books. Sort orders are cached until the sorted column changes.
+
+    Like a list that sort_books sorts in place, the catalogue has a current order: sort() makes the sorted order the
+    current one, and iteration, year filters, title lookups of duplicate titles and ties between equally prolific
+    authors follow it, so results agree with the list functions called in the same sequence.
+    """
+    __slots__ = ('titles', 'authors', 'genres', 'years', 'prices', 'discounted_prices', '_title_rows', '_year_keys',
+                 '_year_rows', '_genre_totals', '_author_counts', '_prolific_author', '_sort_cache', '_order',
+                 '_positions', '_sorted_books')
+
+    def __init__(self, books=()):
+        books = list(books)
+        self.titles = [book['title'] for book in books]
+        self.authors = [book['author'] for book in books]
+        self.genres = [book['genre'] for book in books]
+        self.years = array('q', [int(book['year']) for book in books])
+        self.prices = array('d', [float(book['price']) for book in books])
+        self.discounted_prices = None  # array('d') once a discount has been applied
+        self._build_indexes()
+
+    @classmethod
+    def from_csv(cls, filename):
+        """
+        Read a catalogue from a CSV file with title, author, year, genre and price columns.
+        Args:
+            filename (str): Name of the CSV file
+        Returns:
+            BookCatalogue: The catalogue
+        """
+        catalogue = cls()
+        with open(filename, mode='r', newline='', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                catalogue._append(row['title'], row['author'], int(row['year']), row['genre'], float(row['price']))
+        catalogue._build_indexes()
+        return catalogue
+
+    def _append(self, title, author, year, genre, price):
+        self.titles.append(title)
+        self.authors.append(author)
+        self.years.append(year)
+        self.genres.append(genre)
+        self.prices.append(price)
+
+    def _build_indexes(self):
+        """Build all indexes and aggregates from the columns in one pass (plus one sort for the year index)."""
+        self._title_rows = {}
+        self._genre_totals = {}
+        self._author_counts = {}
+        for row, (title, author, genre, price) in enumerate(zip(self.titles, self.authors, self.genres, self.prices)):
+            self._title_rows.setdefault(title, row)
+            totals = self._genre_totals.setdefault(genre, [0.0, 0])
+            totals[0] += price
+            totals[1] += 1
+            self._author_counts[author] = self._author_counts.get(author, 0) + 1
+        self._year_rows = sorted(range(len(self.years)), key=self.years.__getitem__)
+        self._year_keys = [self.years[row] for row in self._year_rows]
+        self._prolific_author = None
+        self._sort_cache = {}
+        self._order = None  # current order of the rows; None while it is the row order
+        self._positions = None  # position of every row in the current order, built when first needed
+        self._sorted_books = None  # sort() result, kept until a column or the order changes
+
+    def _position(self, row):
+        return row if self._order is None else self._order_positions()[row]
+
+    def _order_positions(self):
+        if self._positions is None:
+            self._positions = array('q', bytes(8 * len(self._order)))
+            for position, row in enumerate(self._order):
+                self._positions[row] = position
+        return self._positions
+
+    def _rows(self):
+        return range(len(self)) if self._order is None else self._order
+
+    def _set_order(self, rows):
+        """Make rows (a permutation of all rows) the current order."""
+        self._order = list(rows)
+        self._positions = None
+        if len(self._title_rows) < len(self.titles):
+            # Duplicate titles: an update by title goes to the first one in the current order
+            self._title_rows = {}
+            for row in self._order:
+                self._title_rows.setdefault(self.titles[row], row)
+        self._prolific_author = None
+        self._sorted_books = None
+
+    def __len__(self):
+        return len(self.titles)
+
+    def book(self, row):
+        """The book in a row as a dictionary (with its discounted price if a discount was applied)."""
+        book = {'title': self.titles[row], 'author': self.authors[row], 'year': self.years[row],
+                'genre': self.genres[row], 'price': self.prices[row]}
+        if self.discounted_prices is not None:
+            book['discounted_price'] = self.discounted_prices[row]
+        return book
+
+    def __iter__(self):
+        return (self.book(row) for row in self._rows())
+
+    def books(self, rows=None):
+        """The books in the given rows (all rows in the current order by default) as a list of dictionaries."""
+        rows = self._rows() if rows is None else rows
+        if len(rows) < 2:
+            return [self.book(row) for row in rows]
+        # One itemgetter gathers each column in C; the dictionaries are built in a single pass
+        take = itemgetter(*rows)
+        columns = [take(column) for column in (self.titles, self.authors, self.years, self.genres, self.prices)]
+        if self.discounted_prices is None:
+            return [{'title': title, 'author': author, 'year': year, 'genre': genre, 'price': price}
+                    for title, author, year, genre, price in zip(*columns)]
+        return [{'title': title, 'author': author, 'year': year, 'genre': genre, 'price': price,
+                 'discounted_price': discounted_price}
+                for title, author, year, genre, price, discounted_price in zip(*columns, take(self.discounted_prices))]
+
+    def apply_discount(self, discount_rate):
+        """Store the discounted price of every book."""
+        self.discounted_prices = array('d', (price * (1 - discount_rate) for price in self.prices))
+        self._sort_cache.pop('discounted_price', None)
+        self._sorted_books = None
+
+    def unique_genres(self):
+        """Set of the genres that have at least one book."""
+        return {genre for genre, (_, count) in self._genre_totals.items() if count}
+
+    def filter_by_year(self, start_year, end_year):
+        """Books published from start_year to end_year (inclusive), in the current order."""
+        lo = bisect.bisect_left(self._year_keys, start_year)
+        hi = bisect.bisect_right(self._year_keys, end_year)
+        rows = self._year_rows[lo:hi]
+        if self._order is None:
+            return self.books(sorted(rows))
+        return self.books(sorted(rows, key=self._order_positions().__getitem__))
+
+    def sorted_rows(self, sort_by, reverse=False):
+        """
+        Rows ordered by a property, with ties in the current order (stable, like list.sort); the order is cached
+        until that column or the current order changes.
+        """
+        orders = self._sort_cache.setdefault(sort_by, {})
+        if reverse not in orders:
+            orders[reverse] = sorted(self._rows(), key=self._column(sort_by).__getitem__, reverse=reverse)
+        return orders[reverse]
+
+    def sort(self, sort_by, reverse=False):
+        """
+        Sort the catalogue by a property, like sort_books does with a list, and return the books in order.
+
+        Like sorting a list in place, sorting again while nothing changed returns the same list of books.
+        """
+        rows = self.sorted_rows(sort_by, reverse)
+        if rows is not self._order:
+            self._set_order(rows)
+            # Orders of other columns broke their ties in the previous order; sorting again by this one changes nothing
+            self._sort_cache = {sort_by: {reverse: self._order}}
+        if self._sorted_books is None:
+            self._sorted_books = self.books(self._order)
+        return self._sorted_books
+
+    def most_prolific_author(self):
+        """The author with the most books; on ties the one whose first book comes first in the current order."""
+        if self._prolific_author is None and self._author_counts:
+            most = max(self._author_counts.values())
+            candidates = {author for author, count in self._author_counts.items() if count == most}
+            self._prolific_author = next(self.authors[row] for row in self._rows() if self.authors[row] in candidates)
+        return self._prolific_author
+
+    def average_price_by_genre(self):
+        """Dictionary of average prices by genre."""
+        return {genre: total / count for genre, (total, count) in self._genre_totals.items() if count}
+
+    def _column(self, name):
+        columns = {'title': self.titles, 'author': self.authors, 'year': self.years, 'genre': self.genres,
+                   'price': self.prices, 'discounted_price': self.discounted_prices}
+        if columns.get(name) is None:
+            raise KeyError(name)
+        return columns[name]
+
+    def update(self, updates):
+        """
+        Update book properties by title, keeping every index and aggregate up to date.
+        Args:
+            updates (dict): Dictionary of {title: {property: value}}; unknown titles and properties are ignored
+        """
+        # A few year changes are applied to the year index one by one; after many, the index is rebuilt once
+        rebuild_years = sum('year' in properties for properties in updates.values()) > 64
+        for title, properties in updates.items():
+            row = self._title_rows.get(title)
+            if row is None:
+                continue
+            for key, value in properties.items():
+                if key == 'price':
+                    self._set_price(row, float(value))
+                elif key == 'year' and rebuild_years:
+                    self.years[row] = int(value)
+                elif key == 'year':
+                    self._set_year(row, int(value))
+                elif key == 'genre':
+                    self._set_genre(row, value)
+                elif key == 'author':
+                    self._set_author(row, value)
+                elif key == 'title':
+                    self._set_title(row, value)
+                elif key == 'discounted_price' and self.discounted_prices is not None:
+                    self.discounted_prices[row] = float(value)
+                else:
+                    continue
+                self._sort_cache.pop(key, None)
+                self._sorted_books = None
+        if rebuild_years:
+            self._year_rows = sorted(range(len(self.years)), key=self.years.__getitem__)
+            self._year_keys = [self.years[row] for row in self._year_rows]
+
+    def _set_price(self, row, price):
+        self._genre_totals[self.genres[row]][0] += price - self.prices[row]
+        self.prices[row] = price
+
+    def _set_year(self, row, year):
+        # Rows with the same year are ordered by row number, so a row is found by two bisections
+        old = self.years[row]
+        lo, hi = bisect.bisect_left(self._year_keys, old), bisect.bisect_right(self._year_keys, old)
+        i = bisect.bisect_left(self._year_rows, row, lo, hi)
+        del self._year_keys[i], self._year_rows[i]
+        lo, hi = bisect.bisect_left(self._year_keys, year), bisect.bisect_right(self._year_keys, year)
+        i = bisect.bisect_left(self._year_rows, row, lo, hi)
+        self._year_keys.insert(i, year)
+        self._year_rows.insert(i, row)
+        self.years[row] = year
+
+    def _set_genre(self, row, genre):
+        old = self._genre_totals[self.genres[row]]
+        old[0] -= self.prices[row]
+        old[1] -= 1
+        new = self._genre_totals.setdefault(genre, [0.0, 0])
+        new[0] += self.prices[row]
+        new[1] += 1
+        self.genres[row] = genre
+
+    def _set_author(self, row, author):
+        old = self.authors[row]
+        self.authors[row] = author
+        self._author_counts[old] -= 1
+        if not self._author_counts[old]:
+            del self._author_counts[old]
+        self._author_counts[author] = self._author_counts.get(author, 0) + 1
+        self._prolific_author = None
+
+    def _set_title(self, row, title):
+        old = self.titles[row]
+        self.titles[row] = title
+        if self._title_rows.get(old) == row:
+            # The next book with the old title in the current order takes over
+            rows = self._rows()
+            later = (rows[p] for p in range(self._position(row) + 1, len(rows)) if self.titles[rows[p]] == old)
+            next_row = next(later, None)
+            if next_row is None:
+                del self._title_rows[old]
+            else:
+                self._title_rows[old] = next_row
+        self._title_rows[title] = min(self._title_rows.get(title, row), row, key=self._position)
+
+    def convert_currency(self, exchange_rate):
+        """Convert every price (rounded to 2 decimals) and recompute the genre totals in the same pass."""
+        if exchange_rate <= 0:
+            raise ValueError("Exchange rate must be greater than zero.")
+        self.prices = array('d', (round(price * exchange_rate, 2) for price in self.prices))
+        for totals in self._genre_totals.values():
+            totals[0] = 0.0
+        for genre, price in zip(self.genres, self.prices):
+            self._genre_totals[genre][0] += price
+        self._sort_cache.pop('price', None)
+        self._sorted_books = None
+
 
 def load_book_data(filename):
     """
@@ -31,12 +320,15 @@ def calculate_discount_price(books, discount_rate):
     """
     Calculate and add discounted price for each book.
     Args:
-        books (list of dict): List of book dictionaries
+        books (list of dict or BookCatalogue): List of book dictionaries
         discount_rate (float): Discount rate to apply
     Returns:
         list of dict: Updated list of book dictionaries with discounted price
     """
     # TODO: Implement discounted price calculation
+    if isinstance(books, BookCatalogue):
+        books.apply_discount(discount_rate)
+        return books
     for book in books:
         # Calculating the discounted price
         discounted_price = book['price'] * (1 - discount_rate)
@@ -49,11 +341,13 @@ def find_unique_genres(books):
     """
     Find unique genres from the data.
     Args:
-        books (list of dict): List of book dictionaries
+        books (list of dict or BookCatalogue): List of book dictionaries
     Returns:
         set: Set of unique genres
     """
     # TODO: Implement unique genres extraction
+    if isinstance(books, BookCatalogue):
+        return books.unique_genres()
     unique_genres = set()
     #Iterating over each book in the list
     for book in books:
@@ -66,13 +360,15 @@ def filter_books_by_year(books, start_year, end_year):
     """
     Filter books based on publication year range.
     Args:
-        books (list of dict): List of book dictionaries
+        books (list of dict or BookCatalogue): List of book dictionaries
         start_year (int): Start year of the range
         end_year (int): End year of the range
     Returns:
         list of dict: Filtered list of book dictionaries
     """
     # TODO: Implement book filtering by year
+    if isinstance(books, BookCatalogue):
+        return books.filter_by_year(start_year, end_year)
     filtered_books = []
     # Iterate over each book in the list
     for book in books:
@@ -85,13 +381,15 @@ def sort_books(books, sort_by, reverse=False):
     """
     Sort books based on a specified property.
     Args:
-        books (list of dict): List of book dictionaries
+        books (list of dict or BookCatalogue): List of book dictionaries
         sort_by (str): Property to sort by
         reverse (bool): Sort in descending order if True
     Returns:
         list of dict: Sorted list of book dictionaries
     """
     # TODO: Implement book sorting
+    if isinstance(books, BookCatalogue):
+        return books.sort(sort_by, reverse)
     books.sort(key=lambda book: book[sort_by], reverse=reverse)
     return books
 
@@ -99,11 +397,13 @@ def find_most_prolific_author(books):
     """
     Find the author with the most books in the dataset.
     Args:
-        books (list of dict): List of book dictionaries
+        books (list of dict or BookCatalogue): List of book dictionaries
     Returns:
         str: Name of the most prolific author
     """
     # TODO: Implement finding the most prolific author
+    if isinstance(books, BookCatalogue):
+        return books.most_prolific_author()
     author_count = {}
     # Counting the occurances of each author
     for book in books:
@@ -127,11 +427,13 @@ def calculate_average_price_by_genre(books):
     """
     Calculate average book price for each genre.
     Args:
-        books (list of dict): List of book dictionaries
+        books (list of dict or BookCatalogue): List of book dictionaries
     Returns:
         dict: Dictionary of average prices by genre
     """
     # TODO: Implement average price calculation by genre
+    if isinstance(books, BookCatalogue):
+        return books.average_price_by_genre()
     # Dictionary to hold the total price and count of books for each genre
     genre_totals = {}
 
@@ -157,7 +459,7 @@ def generate_book_report(books, output_filename):
     """
     Generate a formatted report of books and their properties.
     Args:
-        books (list of dict): List of book dictionaries
+        books (list of dict or BookCatalogue): List of book dictionaries
         output_filename (str): Name of the output text file
     """
     # TODO: Implement report generation
@@ -181,34 +483,57 @@ def update_book_properties(books, updates):
     """
     Update book properties based on provided updates.
     Args:
-        books (list of dict): List of book dictionaries
+        books (list of dict or BookCatalogue): List of book dictionaries
         updates (dict): Dictionary of updates for books
     Returns:
         list of dict: Updated list of book dictionaries
     """
     # TODO: Implement book property updates with error handling
+    if isinstance(books, BookCatalogue):
+        books.update(updates)
+        return books
+
+    # Index the position of the first book with each title once, instead of searching the list for every update
+    first_positions = {}
+    for position, book in enumerate(books):
+        first_positions.setdefault(book['title'], position)
+
     for title, properties in updates.items():
         # Find the book by title
-        for book in books:
-            if book['title'] == title:
-                # Update the book's properties
-                for key, value in properties.items():
-                    if key in book:
-                        book[key] = value
-                break # Exit loop after updating the book
+        position = first_positions.get(title)
+        if position is None:
+            continue
+        book = books[position]
+        # Update the book's properties
+        for key, value in properties.items():
+            if key in book:
+                book[key] = value
+        # Keep the index pointing at the first book with each title if the title changed
+        if book['title'] != title:
+            later = (i for i in range(position + 1, len(books)) if books[i]['title'] == title)
+            next_position = next(later, None)
+            if next_position is None:
+                del first_positions[title]
+            else:
+                first_positions[title] = next_position
+            first_positions[book['title']] = min(first_positions.get(book['title'], position), position)
+    return books
 
 
 def convert_currency(books, exchange_rate):
     """
     Convert book prices to a different currency.
     Args:
-        books (list of dict): List of book dictionaries
+        books (list of dict or BookCatalogue): List of book dictionaries
         exchange_rate (float): Exchange rate to apply
     Returns:
         list of dict: Updated list of book dictionaries with converted prices
     """
     # TODO: Implement currency conversion with error handling
     # We must first check if the given exchange rate is valid
+    if isinstance(books, BookCatalogue):
+        books.convert_currency(exchange_rate)
+        return books
     if exchange_rate <= 0:
         raise ValueError("Exchange rate must be greater than zero.")
     
@@ -221,15 +546,78 @@ def convert_currency(books, exchange_rate):
             print(f"Warning: Missing price key for book '{book.get('title', 'Unknown')}'.")
         except Exception as e:
             print(f"Error converting price for book '{book.get('title', 'Unknown')}': {e}")
+    return books
         
 
+def benchmark_catalogue(n_books=10**6, n_queries=100, n_updates=1000, seed=0):
+    """
+    Compare the list-of-dicts functions with the same functions on a BookCatalogue and check that they agree.
+    Args:
+        n_books (int): Number of synthetic books
+        n_queries (int): Number of year range queries
+        n_updates (int): Number of title updates
+        seed (int): Random seed
+    Returns:
+        dict: Dictionary of {operation: (list seconds, catalogue seconds)}
+    """
+    rng = random.Random(seed)
+    authors = [f"Author {i}" for i in range(n_books // 20 + 1)]
+    genres = ['Fantasy', 'Romance', 'Science Fiction', 'Mystery', 'Historical Fiction', 'Biography']
+    rows = [{'title': f"Book {i}", 'author': rng.choice(authors), 'year': rng.randint(1900, 2023),
+             'genre': rng.choice(genres), 'price': round(rng.uniform(5, 30), 2)} for i in range(n_books)]
+    ranges = [(start, start + rng.randint(0, 10)) for start in (rng.randint(1900, 2023) for _ in range(n_queries))]
+    updates = {f"Book {rng.randrange(n_books)}": {'price': round(rng.uniform(5, 30), 2), 'year': rng.randint(1900, 2023)}
+               for _ in range(n_updates)}
+
+    def timed(function):
+        start = time.perf_counter()
+        result = function()
+        return result, time.perf_counter() - start
+
+    books, list_build = timed(lambda: [dict(row) for row in rows])
+    catalogue, catalogue_build = timed(lambda: BookCatalogue(rows))
+    timings = {'build': (list_build, catalogue_build)}
+
+    operations = {
+        f'{n_queries} year filters': lambda b: [len(filter_books_by_year(b, lo, hi)) for lo, hi in ranges],
+        'sort by price (x3)': lambda b: [sort_books(b, 'price', reverse=True)[0]['title'] for _ in range(3)],
+        'most prolific author': find_most_prolific_author,
+        'average price by genre': calculate_average_price_by_genre,
+        f'{n_updates} updates': lambda b: update_book_properties(b, updates) and None,
+        'prolific author after updates': find_most_prolific_author,
+        'average price after updates': calculate_average_price_by_genre,
+        'convert currency': lambda b: convert_currency(b, 0.85) and None,
+        'average price after conversion': calculate_average_price_by_genre,
+    }
+    for name, operation in operations.items():
+        list_result, list_time = timed(lambda: operation(books))
+        catalogue_result, catalogue_time = timed(lambda: operation(catalogue))
+        if isinstance(list_result, dict):
+            assert all(abs(list_result[g] - catalogue_result[g]) < 1e-6 for g in list_result)
+        else:
+            assert list_result == catalogue_result, name
+        timings[name] = (list_time, catalogue_time)
+
+    print(f"{'operation':<30}{'list of dicts':>15}{'catalogue':>12}")
+    for name, (list_time, catalogue_time) in timings.items():
+        print(f"{name:<30}{list_time:>14.3f}s{catalogue_time:>11.3f}s")
+    return timings
+
 def main():
+    parser = argparse.ArgumentParser(description="Book data analysis")
+    parser.add_argument("--benchmark", type=int, metavar="N_BOOKS", nargs='?', const=10**6,
+                        help="compare the list of dicts with the BookCatalogue on N_BOOKS synthetic books")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark_catalogue(args.benchmark)
+        return
+
     input_file = "books.csv"
     output_file = "book_analysis_report.txt"
     
     try:
         # Load data
-        books = load_book_data(input_file)
+        books = BookCatalogue.from_csv(input_file)
         
         # Process data
         books = calculate_discount_price(books, 0.1)  # 10% discount
@@ -244,7 +632,7 @@ def main():
         avg_prices = calculate_average_price_by_genre(books)
         
         # Generate report
-        generate_book_report(books, output_file)
+        generate_book_report(sorted_books, output_file)
         
         # Perform updates and conversions
         updates = {'Book 1': {'year': 1960}, 'Book 2': {'price': 12.99}}
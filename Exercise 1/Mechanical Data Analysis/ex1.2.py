@@ -1,4 +1,8 @@
+import argparse
 import csv
+import warnings
+
+import numpy as np
 
 def read_mechanical_data(filename):
     """
@@ -142,12 +146,158 @@ def write_results(filename, results_data):
         writer.writerow(results_data.values())
     print(f"Results succesfully written to {filename}")
 
+def read_mechanical_chunks(filename, chunk_size=100000):
+    """
+    Read mechanical data from a CSV file in chunks of float64 arrays.
+    
+    Args:
+    filename (str): Name of the CSV file
+    chunk_size (int): Number of rows per chunk
+    
+    Yields:
+    tuple: (time, position, force) arrays of one chunk
+    """
+    with open(filename, mode='r') as file:
+        next(file) # Skipping the header row
+        while True:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning) # loadtxt warns when the file is exhausted
+                chunk = np.loadtxt(file, delimiter=',', usecols=(0, 1, 2), max_rows=chunk_size, ndmin=2)
+            if chunk.shape[0] == 0:
+                return
+            yield chunk[:, 0], chunk[:, 1], chunk[:, 2]
+
+def new_kinematics_state():
+    """
+    Create the state carried between chunks by kinematics_chunk.
+    
+    Returns:
+    dict: Last sample, last velocity and its time, work done and maximum force so far
+    """
+    return {
+        "last_sample": None,           # (time, position, force) of the last sample seen
+        "last_velocity": None,         # (time, velocity) of the last interval seen
+        "work_done": 0.0,
+        "max_force": float('-inf'),
+        "max_force_time": None,
+        "samples": 0,
+    }
+
+def kinematics_chunk(time, position, force, state):
+    """
+    Calculate velocity and acceleration for one chunk of samples and update the running work and maximum force.
+    
+    Differences use the actual timestamps. The velocity of a sample is the one over the interval ending at it,
+    (x[i] - x[i-1]) / (t[i] - t[i-1]), timed at the interval midpoint as in calculate_velocity; the acceleration
+    of a sample is the change between the velocities of the two intervals ending at it divided by the time between
+    their midpoints. Work is summed with the trapezoidal rule over position, as in calculate_work_done. The last
+    sample and velocity are carried over in state, so chunk boundaries do not change the results; the first sample
+    has no velocity and the first two have no acceleration (NaN).
+    
+    Args:
+    time (np.ndarray): Sample times
+    position (np.ndarray): Positions
+    force (np.ndarray): Forces
+    state (dict): State from new_kinematics_state, updated in place
+    
+    Returns:
+    tuple: (velocity, acceleration) arrays, one value per sample
+    """
+    n = len(time)
+    if n == 0:
+        return np.zeros(0), np.zeros(0)
+
+    # Find maximum force (the first sample in case of ties)
+    k = int(np.argmax(force))
+    if force[k] > state["max_force"]:
+        state["max_force"] = float(force[k])
+        state["max_force_time"] = float(time[k])
+
+    # Prepend the last sample of the previous chunk so that the first interval crosses the boundary
+    if state["last_sample"] is not None:
+        t_prev, x_prev, f_prev = state["last_sample"]
+        t, x, f = np.r_[t_prev, time], np.r_[x_prev, position], np.r_[f_prev, force]
+    else:
+        t, x, f = time, position, force
+    dx = np.diff(x)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        interval_velocity = dx / np.diff(t)
+    interval_time = (t[:-1] + t[1:]) / 2
+    state["work_done"] += float(np.sum((f[:-1] + f[1:]) / 2 * dx))
+
+    # Velocities of the intervals ending at the samples of this chunk
+    velocity = np.full(n, np.nan)
+    velocity[n - len(interval_velocity):] = interval_velocity
+
+    # Acceleration between consecutive intervals, including the last interval of the previous chunk
+    if state["last_velocity"] is not None:
+        v_time, v = np.r_[state["last_velocity"][0], interval_time], np.r_[state["last_velocity"][1], interval_velocity]
+    else:
+        v_time, v = interval_time, interval_velocity
+    with np.errstate(divide='ignore', invalid='ignore'):
+        interval_acceleration = np.diff(v) / np.diff(v_time)
+    acceleration = np.full(n, np.nan)
+    acceleration[n - len(interval_acceleration):] = interval_acceleration
+
+    state["last_sample"] = (float(time[-1]), float(position[-1]), float(force[-1]))
+    if len(interval_velocity):
+        state["last_velocity"] = (float(interval_time[-1]), float(interval_velocity[-1]))
+    state["samples"] += n
+    return velocity, acceleration
+
+def stream_mechanical_analysis(input_file, output_file, samples_file, chunk_size=100000):
+    """
+    Analyze a mechanical data CSV file chunk by chunk, in constant memory.
+    
+    Per-sample results (time, position, force, velocity, acceleration) are written as columns to samples_file while
+    the file is read; the maximum force and the work done are written to output_file at the end.
+    
+    Args:
+    input_file (str): Name of the mechanical data CSV file
+    output_file (str): Name of the summary output CSV file
+    samples_file (str): Name of the per-sample output CSV file
+    chunk_size (int): Number of rows per chunk
+    
+    Returns:
+    dict: The summary results
+    """
+    state = new_kinematics_state()
+    with open(samples_file, mode='w', newline='', buffering=1 << 20) as csvfile:
+        csvfile.write("time,position,force,velocity,acceleration\n")
+        for time, position, force in read_mechanical_chunks(input_file, chunk_size):
+            velocity, acceleration = kinematics_chunk(time, position, force, state)
+            np.savetxt(csvfile, np.column_stack((time, position, force, velocity, acceleration)),
+                       delimiter=',', fmt='%.17g')
+    print(f"Per-sample results for {state['samples']} samples written to {samples_file}")
+
+    results = {
+        "max_force": (state["max_force_time"], state["max_force"]),
+        "work_done": state["work_done"],
+    }
+    write_results(output_file, results)
+    return results
 
 def main():
-    input_file = "mechanical_data.csv"
-    output_file = "analysis_results.csv"
+    parser = argparse.ArgumentParser(description="Mechanical data analysis")
+    parser.add_argument("--stream", action="store_true", help="process the data in chunks with the actual timestamps")
+    parser.add_argument("--input", default="mechanical_data.csv", help="input CSV file")
+    parser.add_argument("--output", default="analysis_results.csv", help="output CSV file")
+    parser.add_argument("--samples-output", default="kinematics_results.csv",
+                        help="per-sample output CSV file in streaming mode")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="rows per chunk in streaming mode")
+    args = parser.parse_args()
+
+    input_file = args.input
+    output_file = args.output
     time_step = 0.1  # s
 
+    if args.stream:
+        try:
+            stream_mechanical_analysis(input_file, output_file, args.samples_output, args.chunk_size)
+        except Exception as e:
+            print(f"An error occurred: {str(e)}")
+        return
+
     try:
         # Read mechanical data
         data = read_mechanical_data(input_file)